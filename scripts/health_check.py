@@ -3,42 +3,136 @@
 Health check script for MCP Polygon Server
 """
 
+import http.client
 import os
 import sys
-import requests
 import time
 
-def check_health():
-    """Check if the server is healthy"""
+# Get port from environment or default to 8000, parsed once per process
+_PORT = int(os.environ.get("PORT", 8000))
+# IPv4 literal skips getaddrinfo; the server binds 0.0.0.0 so loopback reaches it
+_HOST = "127.0.0.1"
+_HEALTH_PATH = "/health"
+_CONNECT_TIMEOUT = 0.5
+_READ_TIMEOUT = 5
+# Comma-separated endpoints to probe, e.g. "/health,/health/db"; an empty list would pass
+# without probing anything, so a blank setting falls back to the default endpoint
+_HEALTH_PATHS = [
+    p.strip() for p in os.environ.get("HEALTHCHECK_PATHS", _HEALTH_PATH).split(",") if p.strip()
+] or [_HEALTH_PATH]
+
+# Pre-encoded so the success path is a single binary write
+_OK = "✅ Server is healthy\n".encode()
+
+# socket.timeout is an alias of TimeoutError, so both map to the same message
+_FAILURE_MESSAGES = {
+    ConnectionRefusedError: "Cannot connect to server",
+    TimeoutError: "Health check timed out",
+}
+
+def check_health(path=_HEALTH_PATH, quiet=False):
+    """Check if the server is healthy
+
+    Args:
+        path: Endpoint to probe
+        quiet: Suppress failure messages, used while polling a starting server
+    """
+    conn = http.client.HTTPConnection(_HOST, _PORT, timeout=_CONNECT_TIMEOUT)
     try:
-        # Get port from environment or default to 8000
-        port = int(os.environ.get("PORT", 8000))
-        
-        # Try to connect to the health endpoint
-        response = requests.get(f"http://localhost:{port}/health", timeout=5)
-        
-        if response.status_code == 200:
-            print("✅ Server is healthy")
+        # Loopback connects in well under a millisecond, so fail fast when the server
+        # is down but still give a live server the full read budget to answer
+        conn.connect()
+        conn.sock.settimeout(_READ_TIMEOUT)
+
+        # HEAD keeps the probe to a status line and headers, no body to read
+        conn.request("HEAD", path)
+        response = conn.getresponse()
+        status = response.status
+        response.close()
+
+        # Endpoints without HEAD support get a GET whose body is never read
+        if status == 405:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            status = response.status
+            response.close()
+
+        if status == 200:
+            sys.stdout.buffer.write(_OK)
             return True
         else:
-            print(f"❌ Server returned status code: {response.status_code}")
+            if not quiet:
+                print(f"❌ Server returned status code {status} for {path}")
             return False
-            
-    except requests.exceptions.ConnectionError:
-        print("❌ Cannot connect to server")
-        return False
-    except requests.exceptions.Timeout:
-        print("❌ Health check timed out")
-        return False
-    except Exception as e:
-        print(f"❌ Health check failed: {e}")
+
+    except (OSError, http.client.HTTPException) as e:
+        if not quiet:
+            print(f"❌ {_FAILURE_MESSAGES.get(type(e), 'Health check failed')} ({path}): {e}")
         return False
+    finally:
+        conn.close()
+
+async def check_all(paths, quiet=False):
+    """Probe every endpoint concurrently so total latency is the slowest probe, not the sum"""
+    import asyncio
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(check_health, path, quiet) for path in paths),
+        return_exceptions=True,
+    )
+    return all(result is True for result in results)
+
+def _probe(paths, quiet=False):
+    if len(paths) == 1:
+        return check_health(paths[0], quiet)
+    # asyncio is only imported when several endpoints are configured
+    import asyncio
+
+    return asyncio.run(check_all(paths, quiet))
+
+def wait_until_healthy(paths=None, timeout=8.0):
+    """Poll the given endpoints until all are healthy or the timeout elapses
+
+    Importable so several checks can share one interpreter instead of
+    spawning this script once per endpoint.
+
+    Args:
+        paths: Endpoints to probe, defaults to HEALTHCHECK_PATHS
+        timeout: Seconds to keep polling before the final, reported attempt
+
+    Returns:
+        bool: True if every endpoint returned 200
+    """
+    paths = paths or _HEALTH_PATHS
+    # Poll with exponential backoff so a ready server answers immediately
+    # while a slow start still gets time to come up (inside the 10s HEALTHCHECK timeout)
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() + delay < deadline:
+        if _probe(paths, quiet=True):
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+    # Final attempt reports why the server is unhealthy
+    return _probe(paths)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Health check for MCP Polygon Server")
+    parser.add_argument("--paths", nargs="+", default=_HEALTH_PATHS,
+                        help="Endpoints to probe in one process (default: HEALTHCHECK_PATHS or /health)")
+    parser.add_argument("--timeout", type=float, default=8.0,
+                        help="Seconds to keep polling before giving up")
+    args = parser.parse_args(argv)
+
+    # Warm-up is normally left to the orchestrator's start period; opt in to a fixed wait if needed
+    initial_delay = float(os.environ.get("HEALTHCHECK_INITIAL_DELAY", "0"))
+    if initial_delay > 0:
+        time.sleep(initial_delay)
+
+    return 0 if wait_until_healthy(args.paths, args.timeout) else 1
 
 if __name__ == "__main__":
-    # Give the server a moment to start up
-    time.sleep(2)
-    
-    if check_health():
-        sys.exit(0)
-    else:
-        sys.exit(1)
+    sys.exit(main())
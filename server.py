@@ -1,18 +1,48 @@
+import asyncio
+import functools
+import logging
 import os
-import json
+import sys
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone, date
-from typing import Dict, Any, List, Optional, Union, Literal
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union, Literal
+from urllib.parse import parse_qsl, urlsplit
+from zoneinfo import ZoneInfo
 
-import requests
-from colorama import Fore
+import aiohttp
+import numpy as np
+import orjson
+from aiolimiter import AsyncLimiter
+from cachetools import LRUCache, TLRUCache, TTLCache, cached
 from dotenv import load_dotenv
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Number of active client sessions sharing the Polygon HTTP session
+_lifespan_users = 0
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Close the shared Polygon HTTP session once the last client session ends"""
+    global _lifespan_users
+    _lifespan_users += 1
+    try:
+        yield
+    finally:
+        _lifespan_users -= 1
+        if _lifespan_users == 0:
+            await _close_polygon_session()
+
 # Create server
-mcp = FastMCP("polygonserver")
+mcp = FastMCP("polygonserver", lifespan=_lifespan)
 
 # Add in a prompt function
 @mcp.prompt()
@@ -28,12 +58,24 @@ import chromadb
 # Initialize ChromaDB client
 chroma_client = chromadb.PersistentClient(path="ticker_db")
 
-# Get or create the collection
+# Get or create the collection (HNSW settings only apply when it is first created)
+collection = chroma_client.get_or_create_collection(
+    name="stock_tickers",
+    metadata={"hnsw:space": "cosine", "hnsw:M": 16, "hnsw:search_ef": 32},
+)
+
+# Warm up the embedding model and load the HNSW index so the first real lookup is fast
 try:
-    collection = chroma_client.get_collection(name="stock_tickers")
+    collection.query(query_texts=["warmup"], n_results=1)
 except Exception:
-    # If collection doesn't exist, create it
-    collection = chroma_client.create_collection(name="stock_tickers")
+    # An empty or unavailable collection just means there is nothing to warm
+    pass
+# The ticker collection is static, so repeated lookups for the same name are served from memory
+@cached(TTLCache(maxsize=1024, ttl=3600), lock=Lock())
+def _query_tickers(stock_name: str) -> str:
+    results = collection.query(query_texts=[stock_name], n_results=1)
+    return str(results)
+
 @mcp.resource("tickers://search/{stock_name}")
 def list_tickers(stock_name:str)->str: 
     """This resource allows you to find a stock ticker by passing through a stock name e.g. Google, Bank of America etc. 
@@ -49,8 +91,7 @@ def list_tickers(stock_name:str)->str:
         
     """
     try:
-        results = collection.query(query_texts=[stock_name], n_results=1) 
-        return str(results)
+        return _query_tickers(stock_name)
     except Exception as e:
         return f"Error searching for ticker '{stock_name}': {str(e)}" 
     
@@ -62,24 +103,343 @@ def _require_polygon_api_key() -> str:
     return api_key
 
 
-def _polygon_get(path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    api_key = _require_polygon_api_key()
-    base_url = "https://api.polygon.io"
-    url = f"{base_url}{path}"
-    params = dict(params or {})
-    params["apiKey"] = api_key
-    response = requests.get(url, params=params, timeout=20)
-    response.raise_for_status()
-    return response.json()
+# Resolved once at startup so a missing key fails loudly here rather than inside a tool call
+_POLYGON_API_KEY = _require_polygon_api_key()
+_POLYGON_BASE_URL = "https://api.polygon.io"
+
+# Shared aiohttp session so concurrent tool calls overlap on one keep-alive connection pool
+_polygon_session: Optional[aiohttp.ClientSession] = None
+
+# Transient statuses and connection errors retried with exponential backoff (0.2s, 0.4s,
+# 0.8s), or after the response's Retry-After when it asks for longer, up to a minute
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 3
+_RETRY_BACKOFF = 0.2
+_MAX_RETRY_AFTER = 60.0
+
+
+# Outbound throttling shared by every tool: cap concurrent requests and, when
+# POLYGON_RPS is set (e.g. 5/min on the free plan is 0.083), requests per second
+_POLYGON_MAX_INFLIGHT = int(os.environ.get("POLYGON_MAX_INFLIGHT", 10))
+_POLYGON_RPS = float(os.environ.get("POLYGON_RPS", 0))
+_INFLIGHT = asyncio.Semaphore(_POLYGON_MAX_INFLIGHT)
+_RATE_LIMITER: Optional[AsyncLimiter] = None
+if _POLYGON_RPS >= 1:
+    _RATE_LIMITER = AsyncLimiter(_POLYGON_RPS, 1.0)
+elif _POLYGON_RPS > 0:
+    # A bucket must hold at least one request, so sub-1 rates become one request per 1/RPS seconds
+    _RATE_LIMITER = AsyncLimiter(1, 1 / _POLYGON_RPS)
+
+
+@asynccontextmanager
+async def _polygon_slot() -> AsyncIterator[None]:
+    async with _INFLIGHT:
+        if _RATE_LIMITER is not None:
+            await _RATE_LIMITER.acquire()
+        yield
+
+
+# Only advertise brotli when a decoder is installed; aiohttp can't decode it otherwise
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip"
+
+# isal decompresses gzip several times faster than stdlib zlib; aiohttp >= 3.12 can use it
+try:
+    from isal import isal_zlib
+    if hasattr(aiohttp, "set_zlib_backend"):
+        aiohttp.set_zlib_backend(isal_zlib)
+except ImportError:
+    pass
+
+
+async def _get_polygon_session() -> aiohttp.ClientSession:
+    global _polygon_session
+    if _polygon_session is None or _polygon_session.closed:
+        _polygon_session = aiohttp.ClientSession(
+            base_url=_POLYGON_BASE_URL,
+            # Every request goes to api.polygon.io, so the per-host cap is the pool size
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=64, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=20),
+            # The key travels as a session header so per-call params never need copying
+            headers={
+                "Accept-Encoding": _ACCEPT_ENCODING,
+                "Authorization": f"Bearer {_POLYGON_API_KEY}",
+            },
+        )
+    return _polygon_session
+
+
+async def _close_polygon_session() -> None:
+    global _polygon_session
+    if _polygon_session is not None and not _polygon_session.closed:
+        await _polygon_session.close()
+    _polygon_session = None
+
+
+# Seconds a response stays fresh, by path prefix; the first matching prefix wins
+_TTL_BY_PREFIX: Tuple[Tuple[str, int], ...] = (
+    ("/v1/marketstatus/upcoming", 86400),
+    ("/vX/reference/financials", 3600),
+    ("/v3/reference/options/contracts", 300),
+    ("/v2/reference/analysts", 900),
+    ("/v2/reference/short-interest", 900),
+    ("/v3/reference/", 3600),
+    ("/v2/snapshot/", 5),
+    ("/v3/snapshot/", 5),
+)
+_DEFAULT_TTL = 60
+_PREV_CLOSE_TTL = 3600
+
+
+def _ttl_for(path: str) -> int:
+    for prefix, ttl in _TTL_BY_PREFIX:
+        if path.startswith(prefix):
+            return ttl
+    if path.startswith("/v2/aggs/ticker/") and path.endswith("/prev"):
+        return _PREV_CLOSE_TTL
+    return _DEFAULT_TTL
+
+
+def _expires_at(key: Tuple[str, frozenset, Callable], value: Any, now: float) -> float:
+    return now + _ttl_for(key[0])
+
+
+# One response cache whose entries expire on their endpoint's TTL
+_GET_CACHE: TLRUCache = TLRUCache(maxsize=4096, ttu=_expires_at)
+_CACHE_LOCK = Lock()
+# (ETag, Last-Modified, data) of recent responses, kept past their TTL for conditional requests
+_Validated = Tuple[Optional[str], Optional[str], Any]
+_VALIDATORS: LRUCache = LRUCache(maxsize=1024)
+# Fetches currently in flight, by cache key
+_PENDING: Dict[Tuple[str, frozenset, Callable], "asyncio.Future[Any]"] = {}
+
+
+async def _read_json(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+    # orjson parses the raw bytes directly, skipping the str decode response.json() would do
+    return orjson.loads(await response.read())
+
+
+async def _read_bytes(response: aiohttp.ClientResponse) -> bytes:
+    return await response.read()
+
+
+async def _polygon_get(
+    path: str,
+    params: Dict[str, Any] | None = None,
+    reader: Callable[[aiohttp.ClientResponse], Awaitable[Any]] = _read_json,
+) -> Any:
+    # Raw and parsed reads of the same request are cached separately
+    key = (path, frozenset((params or {}).items()), reader)
+    with _CACHE_LOCK:
+        data = _GET_CACHE.get(key)
+    if data is not None:
+        return data
+    # Concurrent misses for the same request share one fetch instead of each going to Polygon
+    pending = _PENDING.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_fetch_and_cache(key, path, params, reader))
+        _PENDING[key] = pending
+        pending.add_done_callback(lambda _: _PENDING.pop(key, None))
+    # Shielded so a cancelled caller doesn't abort the fetch the others are waiting on
+    return await asyncio.shield(pending)
+
+
+async def _fetch_and_cache(
+    key: Tuple[str, frozenset, Callable],
+    path: str,
+    params: Dict[str, Any] | None,
+    reader: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+) -> Any:
+    # After the TTL lapses, revalidate with the last ETag/Last-Modified instead of refetching
+    with _CACHE_LOCK:
+        validated = _VALIDATORS.get(key)
+    validated = await _fetch_polygon(path, params, reader, validated)
+    etag, last_modified, data = validated
+    with _CACHE_LOCK:
+        _GET_CACHE[key] = data
+        if etag or last_modified:
+            _VALIDATORS[key] = validated
+    return data
+
+
+async def _fetch_polygon(
+    path: str,
+    params: Dict[str, Any] | None = None,
+    reader: Callable[[aiohttp.ClientResponse], Awaitable[Any]] = _read_json,
+    validated: Optional[_Validated] = None,
+) -> _Validated:
+    """Fetch a Polygon path, returning (ETag, Last-Modified, data).
+
+    When `validated` holds a previous response, the request is made conditional and a
+    304 Not Modified returns that response without reading or parsing a body.
+    """
+    headers = {}
+    if validated is not None:
+        etag, last_modified, _ = validated
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    session = await _get_polygon_session()
+    for attempt in range(_MAX_RETRIES + 1):
+        delay = _RETRY_BACKOFF * 2 ** attempt
+        try:
+            async with _polygon_slot(), session.get(path, params=params, headers=headers) as response:
+                if response.status == 304 and validated is not None:
+                    return validated
+                if response.status not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                    response.raise_for_status()
+                    data = await reader(response)
+                    return response.headers.get("ETag"), response.headers.get("Last-Modified"), data
+                delay = max(delay, _retry_after(response.headers.get("Retry-After")))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == _MAX_RETRIES:
+                raise
+        # Back off outside the slot so a waiting retry doesn't hold up other requests
+        await asyncio.sleep(delay)
+
+
+def _retry_after(value: Optional[str]) -> float:
+    """Seconds a Retry-After header (delta-seconds or HTTP date) asks to wait, capped at _MAX_RETRY_AFTER"""
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER)
+
+
+# Tool output is read by an LLM, so it is compact unless MCP_PRETTY_JSON=true asks for indentation
+_PRETTY_JSON = os.environ.get("MCP_PRETTY_JSON", "false").lower() == "true"
+
+
+def _dumps(data: Any, pretty: bool = _PRETTY_JSON) -> str:
+    """Serialise a tool response with orjson"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+
+
+async def _polygon_get_raw(path: str, params: Dict[str, Any] | None = None) -> str:
+    """Fetch a Polygon path and return its JSON body as sent, for tools that pass it through unchanged"""
+    body = await _polygon_get(path, params=params, reader=_read_bytes)
+    if _PRETTY_JSON:
+        return _dumps(orjson.loads(body))
+    return body.decode()
+
+
+async def _polygon_get_ndjson(path: str, params: Dict[str, Any] | None = None) -> str:
+    """Fetch a Polygon list endpoint and return its results as NDJSON, one record per line.
+
+    When Polygon has another page, a final {"next_url": ...} line carries the cursor.
+    """
+    data = await _polygon_get(path, params=params)
+    lines = list(map(orjson.dumps, data.get("results") or []))
+    if data.get("next_url"):
+        lines.append(orjson.dumps({"next_url": data["next_url"]}))
+    return b"\n".join(lines).decode()
+
+
+def _tool(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Run an async tool, returning any failure as a JSON error object instead of raising.
+
+    The error names the tool, the exception class and any HTTP status, and says whether
+    the same call is worth retrying, so the caller doesn't have to guess.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            status = e.status if isinstance(e, aiohttp.ClientResponseError) else None
+            retryable = status in _RETRY_STATUSES or isinstance(
+                e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+            )
+            logger.warning("Tool %s failed: %s: %s", name, type(e).__name__, e)
+            return _dumps({
+                "tool": name,
+                "error_class": type(e).__name__,
+                "status": status,
+                "message": str(e),
+                "retryable": retryable,
+            })
+    return wrapper
+
+
+# Path templates for parameterised endpoints, filled with str.format
+_PATH_AGGS = "/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
+_PATH_PREV_CLOSE = "/v2/aggs/ticker/{ticker}/prev"
+_PATH_LAST_TRADE = "/v2/last/trade/{ticker}"
+_PATH_LAST_QUOTE = "/v2/last/quote/{ticker}"
+_PATH_SNAPSHOT_TICKER = "/v2/snapshot/locale/{market_type}/markets/{market_type}/tickers/{ticker}"
+_PATH_TICKER_DETAILS = "/v3/reference/tickers/{ticker}"
+_PATH_OPTIONS_SNAPSHOT = "/v3/snapshot/options/{underlying_asset}"
+_PATH_GAINERS_LOSERS = "/v2/snapshot/locale/us/markets/stocks/{direction}"
+
+# Options chain snapshot params accepted in caller-supplied filter dicts; other keys are rejected
+_OPTIONS_SNAPSHOT_RANGES = frozenset(
+    f"{field}.{bound}" for field in ("strike_price", "expiration_date") for bound in ("gt", "gte", "lt", "lte")
+)
+_OPTIONS_SNAPSHOT_FILTERS = frozenset(
+    {"strike_price", "expiration_date", "contract_type", "limit", "order", "sort"}
+) | _OPTIONS_SNAPSHOT_RANGES
+
+
+# Memoised so repeat calls for hot tickers skip the upper() allocation entirely
+@functools.lru_cache(maxsize=1024)
+def _canon(ticker: str) -> str:
+    """Canonical (upper-case, interned) ticker so URLs and cache keys agree regardless of input case"""
+    return sys.intern(ticker.upper())
+
+
+# Polygon expects lower-case booleans; aiohttp rejects bool query values outright
+_BOOL_PARAM = {True: "true", False: "false"}
+
+
+# Query params whose values are tickers
+_TICKER_PARAMS = frozenset({"ticker", "underlying_asset"})
+
+
+def _param(key: str, value: Any) -> Any:
+    if isinstance(value, bool):
+        return _BOOL_PARAM[value]
+    if key in _TICKER_PARAMS:
+        return _canon(value)
+    return value
+
+
+def _params(**kw: Any) -> Dict[str, Any]:
+    """Query params from keyword arguments, dropping unset ones.
+
+    Empty values (None, "", 0) are omitted but False is kept, so explicit boolean
+    filters still reach Polygon. Booleans are lower-cased and tickers canonicalised.
+    """
+    return {k: _param(k, v) for k, v in kw.items() if v or v is False}
 
 
 def _iso_date(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%d")
 
 
+# Fixed query for stock_price, built once rather than per call
+_STOCK_PRICE_PARAMS = {"adjusted": "true", "sort": "asc", "limit": 5000}
+
+
 # Build server function
 @mcp.tool()
-def stock_price(stock_ticker: str) -> str:
+@_tool
+async def stock_price(stock_ticker: str) -> str:
     """This tool returns the last known price for a given stock ticker.
     Args:
         stock_ticker: a alphanumeric stock ticker 
@@ -92,26 +452,25 @@ def stock_price(stock_ticker: str) -> str:
     # Fetch last 30 days of daily closes from Polygon aggregates
     end_dt = datetime.now(timezone.utc)
     start_dt = end_dt - timedelta(days=30)
-    path = f"/v2/aggs/ticker/{stock_ticker.upper()}/range/1/day/{_iso_date(start_dt)}/{_iso_date(end_dt)}"
-    data = _polygon_get(path, params={"adjusted": "true", "sort": "asc", "limit": 5000})
+    path = _PATH_AGGS.format(
+        ticker=_canon(stock_ticker), multiplier=1, timespan="day", from_date=_iso_date(start_dt), to_date=_iso_date(end_dt)
+    )
+    data = await _polygon_get(path, params=_STOCK_PRICE_PARAMS)
 
-    results: List[Dict[str, Any]] = data.get("results", []) or []
-    closes = [
-        {
-            "date": datetime.fromtimestamp(point.get("t", 0) / 1000, tz=timezone.utc).strftime(
-                "%Y-%m-%d"
-            ),
-            "close": point.get("c"),
-        }
-        for point in results
-        if isinstance(point, dict)
+    results: List[Dict[str, Any]] = [
+        point for point in data.get("results", []) or [] if isinstance(point, dict)
     ]
-    print(Fore.YELLOW + str(closes))
+    # Convert all millisecond timestamps to UTC dates in one vectorised pass
+    timestamps = np.fromiter((point.get("t", 0) for point in results), dtype=np.int64, count=len(results))
+    dates = timestamps.astype("datetime64[ms]").astype("datetime64[D]").astype(str).tolist()
+    closes = [{"date": day, "close": point.get("c")} for day, point in zip(dates, results)]
+    logger.debug("stock_price %s rows=%d", stock_ticker, len(closes))
     return str(f"Stock price over the last month for {stock_ticker}: {closes}")
 
 # Add in a stock info tool 
 @mcp.tool()
-def stock_info(stock_ticker: str) -> str:
+@_tool
+async def stock_info(stock_ticker: str) -> str:
     """This tool returns information about a given stock given it's ticker.
     Args:
         stock_ticker: a alphanumeric stock ticker
@@ -122,13 +481,14 @@ def stock_info(stock_ticker: str) -> str:
         Example Respnse "Background information for IBM: {'address1': 'One New Orchard Road', 'city': 'Armonk', 'state': 'NY', 'zip': '10504', 'country': 'United States', 'phone': '914 499 1900', 'website': 
                 'https://www.ibm.com', 'industry': 'Information Technology Services',... }" 
         """
-    path = f"/v3/reference/tickers/{stock_ticker.upper()}"
-    info = _polygon_get(path).get("results", {})
+    path = _PATH_TICKER_DETAILS.format(ticker=_canon(stock_ticker))
+    info = (await _polygon_get(path)).get("results", {})
     return str(f"Background information for {stock_ticker}: {info}")
 
 # Add in an income statement tool
 @mcp.tool()
-def income_statement(stock_ticker: str) -> str:
+@_tool
+async def income_statement(stock_ticker: str) -> str:
     """This tool returns the quarterly income statement for a given stock ticker.
     Args:
         stock_ticker: a alphanumeric stock ticker
@@ -143,8 +503,7 @@ def income_statement(stock_ticker: str) -> str:
         """
 
     # Fetch latest quarterly financials
-    params = {"ticker": stock_ticker.upper(), "timeframe": "quarterly", "limit": 1, "order": "desc"}
-    fin = _polygon_get("/vX/reference/financials", params=params)
+    fin = await _get_financials(stock_ticker, "quarterly", 1, "desc")
     results = (fin.get("results") or [])
     latest = results[0] if results else {}
     return str(f"Income statement for {stock_ticker}: {latest}")
@@ -152,14 +511,15 @@ def income_statement(stock_ticker: str) -> str:
 # Enhanced Polygon API Tools
 
 @mcp.tool()
-def get_aggregates(
+@_tool
+async def get_aggregates(
     ticker: str,
     multiplier: int,
-    timespan: str,
+    timespan: Literal["minute", "hour", "day", "week", "month", "quarter", "year"],
     from_date: Union[str, int, datetime, date],
     to_date: Union[str, int, datetime, date],
     adjusted: Optional[bool] = None,
-    sort: Optional[str] = None,
+    sort: Optional[Literal["asc", "desc"]] = None,
     limit: Optional[int] = None,
 ) -> str:
     """
@@ -178,29 +538,22 @@ def get_aggregates(
     Returns:
         str: JSON string containing aggregate data
     """
-    try:
-        # Convert dates to string format if needed
-        if isinstance(from_date, (datetime, date)):
-            from_date = from_date.strftime("%Y-%m-%d")
-        if isinstance(to_date, (datetime, date)):
-            to_date = to_date.strftime("%Y-%m-%d")
+    # Convert dates to string format if needed
+    if isinstance(from_date, (datetime, date)):
+        from_date = from_date.strftime("%Y-%m-%d")
+    if isinstance(to_date, (datetime, date)):
+        to_date = to_date.strftime("%Y-%m-%d")
+    
+    path = _PATH_AGGS.format(
+        ticker=_canon(ticker), multiplier=multiplier, timespan=timespan, from_date=from_date, to_date=to_date
+    )
+    params = _params(adjusted=adjusted, sort=sort, limit=limit)
         
-        path = f"/v2/aggs/ticker/{ticker.upper()}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
-        params = {}
-        if adjusted is not None:
-            params["adjusted"] = str(adjusted).lower()
-        if sort:
-            params["sort"] = sort
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_previous_close(ticker: str, adjusted: Optional[bool] = None) -> str:
+@_tool
+async def get_previous_close(ticker: str, adjusted: Optional[bool] = None) -> str:
     """
     Get previous day's open, close, high, and low for a specific ticker.
     
@@ -211,19 +564,14 @@ def get_previous_close(ticker: str, adjusted: Optional[bool] = None) -> str:
     Returns:
         str: JSON string containing previous close data
     """
-    try:
-        path = f"/v2/aggs/ticker/{ticker.upper()}/prev"
-        params = {}
-        if adjusted is not None:
-            params["adjusted"] = str(adjusted).lower()
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = _PATH_PREV_CLOSE.format(ticker=_canon(ticker))
+    params = _params(adjusted=adjusted)
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_last_trade(ticker: str) -> str:
+@_tool
+async def get_last_trade(ticker: str) -> str:
     """
     Get the most recent trade for a ticker symbol.
     
@@ -233,15 +581,12 @@ def get_last_trade(ticker: str) -> str:
     Returns:
         str: JSON string containing last trade data
     """
-    try:
-        path = f"/v2/last/trade/{ticker.upper()}"
-        data = _polygon_get(path)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = _PATH_LAST_TRADE.format(ticker=_canon(ticker))
+    return await _polygon_get_raw(path)
 
 @mcp.tool()
-def get_last_quote(ticker: str) -> str:
+@_tool
+async def get_last_quote(ticker: str) -> str:
     """
     Get the most recent quote for a ticker symbol.
     
@@ -251,15 +596,12 @@ def get_last_quote(ticker: str) -> str:
     Returns:
         str: JSON string containing last quote data
     """
-    try:
-        path = f"/v2/last/quote/{ticker.upper()}"
-        data = _polygon_get(path)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = _PATH_LAST_QUOTE.format(ticker=_canon(ticker))
+    return await _polygon_get_raw(path)
 
 @mcp.tool()
-def get_snapshot_ticker(market_type: str, ticker: str) -> str:
+@_tool
+async def get_snapshot_ticker(market_type: str, ticker: str) -> str:
     """
     Get snapshot for a specific ticker.
     
@@ -270,37 +612,31 @@ def get_snapshot_ticker(market_type: str, ticker: str) -> str:
     Returns:
         str: JSON string containing snapshot data
     """
-    try:
-        path = f"/v2/snapshot/locale/{market_type}/markets/{market_type}/tickers/{ticker.upper()}"
-        data = _polygon_get(path)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = _PATH_SNAPSHOT_TICKER.format(market_type=market_type, ticker=_canon(ticker))
+    return await _polygon_get_raw(path)
 
 @mcp.tool()
-def get_market_status() -> str:
+@_tool
+async def get_market_status() -> str:
     """
     Get current trading status of exchanges and financial markets.
     
     Returns:
         str: JSON string containing market status data
     """
-    try:
-        path = "/v1/marketstatus/now"
-        data = _polygon_get(path)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v1/marketstatus/now"
+    return await _polygon_get_raw(path)
 
 @mcp.tool()
-def search_tickers(
+@_tool
+async def search_tickers(
     search: Optional[str] = None,
     type: Optional[str] = None,
     market: Optional[str] = None,
     active: Optional[bool] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
-    order: Optional[str] = None,
+    order: Optional[Literal["asc", "desc"]] = None,
 ) -> str:
     """
     Query supported ticker symbols across stocks, indices, forex, and crypto.
@@ -317,36 +653,19 @@ def search_tickers(
     Returns:
         str: JSON string containing ticker search results
     """
-    try:
-        path = "/v3/reference/tickers"
-        params = {}
-        if search:
-            params["search"] = search
-        if type:
-            params["type"] = type
-        if market:
-            params["market"] = market
-        if active is not None:
-            params["active"] = str(active).lower()
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-        if order:
-            params["order"] = order
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v3/reference/tickers"
+    params = _params(search=search, type=type, market=market, active=active, limit=limit, sort=sort, order=order)
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_ticker_news(
+@_tool
+async def get_ticker_news(
     ticker: Optional[str] = None,
     published_utc: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
-    order: Optional[str] = None,
+    order: Optional[Literal["asc", "desc"]] = None,
 ) -> str:
     """
     Get recent news articles for a stock ticker.
@@ -361,27 +680,14 @@ def get_ticker_news(
     Returns:
         str: JSON string containing news articles
     """
-    try:
-        path = "/v2/reference/news"
-        params = {}
-        if ticker:
-            params["ticker"] = ticker.upper()
-        if published_utc:
-            params["published_utc"] = published_utc
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-        if order:
-            params["order"] = order
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v2/reference/news"
+    params = _params(ticker=ticker, published_utc=published_utc, limit=limit, sort=sort, order=order)
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_dividends(
+@_tool
+async def get_dividends(
     ticker: Optional[str] = None,
     ex_dividend_date: Optional[str] = None,
     frequency: Optional[int] = None,
@@ -401,27 +707,16 @@ def get_dividends(
     Returns:
         str: JSON string containing dividend data
     """
-    try:
-        path = "/v3/reference/dividends"
-        params = {}
-        if ticker:
-            params["ticker"] = ticker.upper()
-        if ex_dividend_date:
-            params["ex_dividend_date"] = ex_dividend_date
-        if frequency:
-            params["frequency"] = frequency
-        if dividend_type:
-            params["dividend_type"] = dividend_type
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v3/reference/dividends"
+    params = _params(
+        ticker=ticker, ex_dividend_date=ex_dividend_date, frequency=frequency, dividend_type=dividend_type, limit=limit
+    )
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_splits(
+@_tool
+async def get_splits(
     ticker: Optional[str] = None,
     execution_date: Optional[str] = None,
     reverse_split: Optional[bool] = None,
@@ -439,29 +734,18 @@ def get_splits(
     Returns:
         str: JSON string containing split data
     """
-    try:
-        path = "/v3/reference/splits"
-        params = {}
-        if ticker:
-            params["ticker"] = ticker.upper()
-        if execution_date:
-            params["execution_date"] = execution_date
-        if reverse_split is not None:
-            params["reverse_split"] = str(reverse_split).lower()
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v3/reference/splits"
+    params = _params(ticker=ticker, execution_date=execution_date, reverse_split=reverse_split, limit=limit)
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_treasury_yields(
+@_tool
+async def get_treasury_yields(
     date: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
-    order: Optional[str] = None,
+    order: Optional[Literal["asc", "desc"]] = None,
 ) -> str:
     """
     Get treasury yield data.
@@ -475,22 +759,95 @@ def get_treasury_yields(
     Returns:
         str: JSON string containing treasury yield data
     """
-    try:
-        path = "/v1/indicators/treasury-yield"
-        params = {}
-        if date:
-            params["date"] = date
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-        if order:
-            params["order"] = order
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v1/indicators/treasury-yield"
+    params = _params(date=date, limit=limit, sort=sort, order=order)
+        
+    return await _polygon_get_raw(path, params=params)
+
+# Batch tools: fetch several tickers in one call, concurrently
+
+
+async def _gather_by_ticker(tickers: List[str], path_for, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch one Polygon path per ticker concurrently, keyed by upper-cased ticker"""
+    symbols = [_canon(ticker) for ticker in tickers]
+    # Concurrency and rate are bounded by the shared limits in _fetch_polygon
+    results = await asyncio.gather(
+        *(_polygon_get(path_for(symbol), params=params) for symbol in symbols), return_exceptions=True
+    )
+    return {
+        symbol: {"error": str(result)} if isinstance(result, Exception) else result
+        for symbol, result in zip(symbols, results)
+    }
+
+@mcp.tool()
+@_tool
+async def batch_get_aggregates(
+    tickers: List[str],
+    multiplier: int,
+    timespan: Literal["minute", "hour", "day", "week", "month", "quarter", "year"],
+    from_date: str,
+    to_date: str,
+    adjusted: Optional[bool] = None,
+    limit: Optional[int] = None,
+) -> str:
+    """
+    Get aggregate bars for several tickers at once over the same date range.
+    
+    Args:
+        tickers: List of stock ticker symbols, e.g. ["NVDA", "AMD", "INTC"]
+        multiplier: Size of the timespan multiplier
+        timespan: Size of the time window (minute, hour, day, week, month, quarter, year)
+        from_date: Start date for the aggregate window (YYYY-MM-DD)
+        to_date: End date for the aggregate window (YYYY-MM-DD)
+        adjusted: Whether the results are adjusted for splits
+        limit: Limit the number of base aggregates queried
+    
+    Returns:
+        str: JSON string mapping each ticker to its aggregate data
+    """
+    params = _params(adjusted=adjusted, limit=limit)
+
+    data = await _gather_by_ticker(
+        tickers,
+        lambda t: _PATH_AGGS.format(
+            ticker=t, multiplier=multiplier, timespan=timespan, from_date=from_date, to_date=to_date
+        ),
+        params,
+    )
+    return _dumps(data)
+
+@mcp.tool()
+@_tool
+async def batch_get_last_quote(tickers: List[str]) -> str:
+    """
+    Get the most recent quote for several tickers at once.
+    
+    Args:
+        tickers: List of stock ticker symbols
+    
+    Returns:
+        str: JSON string mapping each ticker to its last quote data
+    """
+    data = await _gather_by_ticker(tickers, lambda t: _PATH_LAST_QUOTE.format(ticker=t), {})
+    return _dumps(data)
+
+@mcp.tool()
+@_tool
+async def batch_get_previous_close(tickers: List[str], adjusted: Optional[bool] = None) -> str:
+    """
+    Get previous day's open, close, high, and low for several tickers at once.
+    
+    Args:
+        tickers: List of stock ticker symbols
+        adjusted: Whether the results are adjusted for splits
+    
+    Returns:
+        str: JSON string mapping each ticker to its previous close data
+    """
+    params = _params(adjusted=adjusted)
+
+    data = await _gather_by_ticker(tickers, lambda t: _PATH_PREV_CLOSE.format(ticker=t), params)
+    return _dumps(data)
 
 # Add health check endpoint for HTTP transport
 @mcp.tool()
@@ -498,23 +855,47 @@ def health_check() -> str:
     """Health check endpoint for Kubernetes probes"""
     return "OK"
 
-# Kick off server if file is run 
-if __name__ == "__main__":
-    import sys
-    
-    # Check if HTTP transport is requested via environment variable
-    if os.environ.get("MCP_HTTP_TRANSPORT", "false").lower() == "true":
-        port = int(os.environ.get("PORT", 8000))
-        print(f"Starting MCP server with SSE transport on port {port}")
-        
-        # Use FastMCP's SSE transport for better compatibility with MCP clients
-        # This is what Langflow and other MCP clients expect
-        mcp.run(transport="sse", host="0.0.0.0", port=port)
-    else:
-        print("Starting MCP server with stdio transport")
-        mcp.run(transport="stdio")
+@mcp.custom_route("/health", methods=["GET", "HEAD"])
+async def health_route(request: Request) -> PlainTextResponse:
+    """Plain HTTP health endpoint for Docker/Kubernetes probes (HEAD returns headers only)"""
+    return PlainTextResponse("OK")
 
 # Market Hours and Timezone Utilities
+_ET = ZoneInfo("America/New_York")
+
+# Market session for every ET minute of the day, indexed by hour * 60 + minute
+_SESSION_NAMES = ("market_closed", "pre_market", "regular_market", "after_hours")
+_SESSION_LUT = np.zeros(1440, dtype=np.uint8)
+_SESSION_LUT[240:570] = 1  # 4:00 AM - 9:30 AM
+_SESSION_LUT[570:960] = 2  # 9:30 AM - 4:00 PM
+_SESSION_LUT[960:1200] = 3  # 4:00 PM - 8:00 PM
+
+# Static informational payloads are serialised (pretty, since they are small) once at import and returned as-is
+_MARKET_HOURS_JSON = _dumps({
+    "pre_market": {
+        "start": "04:00",
+        "end": "09:30",
+        "timezone": "ET"
+    },
+    "regular_market": {
+        "start": "09:30", 
+        "end": "16:00",
+        "timezone": "ET"
+    },
+    "after_hours": {
+        "start": "16:00",
+        "end": "20:00", 
+        "timezone": "ET"
+    },
+    "important_notes": [
+        "All Polygon timestamps are in UTC (Unix timestamps)",
+        "Convert UTC to ET for market hour alignment",
+        "Pre-market: 4:00 AM - 9:30 AM ET",
+        "Regular market: 9:30 AM - 4:00 PM ET", 
+        "After-hours: 4:00 PM - 8:00 PM ET"
+    ]
+}, pretty=True)
+
 @mcp.tool()
 def get_market_hours_info() -> str:
     """
@@ -523,31 +904,7 @@ def get_market_hours_info() -> str:
     Returns:
         str: JSON string containing market hours information
     """
-    market_hours = {
-        "pre_market": {
-            "start": "04:00",
-            "end": "09:30",
-            "timezone": "ET"
-        },
-        "regular_market": {
-            "start": "09:30", 
-            "end": "16:00",
-            "timezone": "ET"
-        },
-        "after_hours": {
-            "start": "16:00",
-            "end": "20:00", 
-            "timezone": "ET"
-        },
-        "important_notes": [
-            "All Polygon timestamps are in UTC (Unix timestamps)",
-            "Convert UTC to ET for market hour alignment",
-            "Pre-market: 4:00 AM - 9:30 AM ET",
-            "Regular market: 9:30 AM - 4:00 PM ET", 
-            "After-hours: 4:00 PM - 8:00 PM ET"
-        ]
-    }
-    return json.dumps(market_hours, indent=2)
+    return _MARKET_HOURS_JSON
 
 @mcp.tool()
 def convert_utc_to_et(utc_timestamp: int) -> str:
@@ -561,15 +918,11 @@ def convert_utc_to_et(utc_timestamp: int) -> str:
         str: JSON string with both UTC and ET times
     """
     try:
-        from datetime import datetime, timezone, timedelta
-        
         # Create UTC datetime
         utc_dt = datetime.fromtimestamp(utc_timestamp, tz=timezone.utc)
         
-        # Convert to Eastern Time (ET)
-        # Note: This is simplified - in production you'd want to handle DST properly
-        et_offset = timedelta(hours=-5)  # EST (UTC-5)
-        et_dt = utc_dt + et_offset
+        # Convert to Eastern Time (ET), EST or EDT depending on the date
+        et_dt = utc_dt.astimezone(_ET)
         
         result = {
             "utc_timestamp": utc_timestamp,
@@ -578,24 +931,91 @@ def convert_utc_to_et(utc_timestamp: int) -> str:
             "market_session": _determine_market_session(et_dt.hour, et_dt.minute)
         }
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
     except Exception as e:
         return f"Error: {str(e)}"
 
+def _et_offsets(timestamps_ms: np.ndarray) -> np.ndarray:
+    """UTC offset in seconds for each millisecond timestamp, resolved once per distinct hour.
+
+    DST transitions happen on the hour, so every timestamp within an hour shares an offset.
+    """
+    hours, inverse = np.unique(timestamps_ms // 3_600_000, return_inverse=True)
+    offsets = np.array(
+        [datetime.fromtimestamp(int(hour) * 3600, tz=_ET).utcoffset().total_seconds() for hour in hours],
+        dtype=np.int64,
+    )
+    return offsets[inverse]
+
 def _determine_market_session(hour: int, minute: int) -> str:
     """Helper function to determine market session based on ET time."""
-    time_minutes = hour * 60 + minute
-    
-    if 240 <= time_minutes < 570:  # 4:00 AM - 9:30 AM
-        return "pre_market"
-    elif 570 <= time_minutes < 960:  # 9:30 AM - 4:00 PM
-        return "regular_market"
-    elif 960 <= time_minutes < 1200:  # 4:00 PM - 8:00 PM
-        return "after_hours"
-    else:
-        return "market_closed"
+    return _SESSION_NAMES[_SESSION_LUT[hour * 60 + minute]]
+
+def _tag_market_sessions(results: List[Dict[str, Any]]) -> None:
+    """Add market_session and et_time to every timestamped aggregate bar, in place.
+
+    Offsets, session codes and ET strings are computed for all bars in a few NumPy
+    passes; the only per-row Python work is assigning the two fields.
+    """
+    bars = [bar for bar in results if "t" in bar]
+    if not bars:
+        return
+    timestamps = np.fromiter((bar["t"] for bar in bars), dtype=np.int64, count=len(bars))
+    et_seconds = timestamps // 1000 + _et_offsets(timestamps)
+    codes = _SESSION_LUT[(et_seconds // 60) % 1440]
+    # "YYYY-MM-DDTHH:MM:SS" -> "YYYY-MM-DD HH:MM:SS ET"
+    et_times = np.char.add(np.char.replace(np.datetime_as_string(et_seconds.astype("datetime64[s]")), "T", " "), " ET")
+    for bar, code, et_time in zip(bars, codes.tolist(), et_times.tolist()):
+        bar["market_session"] = _SESSION_NAMES[code]
+        bar["et_time"] = et_time
 
 # Enhanced Exchange Information
+_EXCHANGE_INFO_JSON = _dumps({
+    "major_exchanges": [
+        {
+            "name": "New York Stock Exchange",
+            "symbols": ["NYSE", "NYSE American", "NYSE Arca", "NYSE Chicago", "NYSE National"]
+        },
+        {
+            "name": "Nasdaq",
+            "symbols": ["OMX", "BX", "PSX", "Philadelphia"]
+        },
+        {
+            "name": "Cboe Global Markets", 
+            "symbols": ["BZX", "BYX", "EDGX", "EDGA"]
+        },
+        {
+            "name": "MIAX Exchange Group",
+            "symbols": ["Pearl", "Emerald", "Equities"]
+        },
+        {
+            "name": "Members Exchange",
+            "symbols": ["MEMX"]
+        },
+        {
+            "name": "Investors Exchange",
+            "symbols": ["IEX"]
+        },
+        {
+            "name": "Long-Term Stock Exchange",
+            "symbols": ["LTSE"]
+        }
+    ],
+    "additional_sources": [
+        {
+            "name": "FINRA Trading Facilities",
+            "description": "Provides trade reporting but not quotes",
+            "facilities": ["FINRA NYSE TRF", "FINRA Nasdaq TRF Carteret", "FINRA Nasdaq TRF Chicago"]
+        },
+        {
+            "name": "OTC Reporting Facility", 
+            "description": "Captures OTC trades but not quotes"
+        }
+    ],
+    "total_coverage": "19 major stock exchanges + dark pools + FINRA + OTC",
+    "data_quality": "Direct exchange feeds + SIP consolidation for accuracy"
+}, pretty=True)
+
 @mcp.tool()
 def get_exchange_info() -> str:
     """
@@ -604,63 +1024,19 @@ def get_exchange_info() -> str:
     Returns:
         str: JSON string containing exchange information
     """
-    exchanges = {
-        "major_exchanges": [
-            {
-                "name": "New York Stock Exchange",
-                "symbols": ["NYSE", "NYSE American", "NYSE Arca", "NYSE Chicago", "NYSE National"]
-            },
-            {
-                "name": "Nasdaq",
-                "symbols": ["OMX", "BX", "PSX", "Philadelphia"]
-            },
-            {
-                "name": "Cboe Global Markets", 
-                "symbols": ["BZX", "BYX", "EDGX", "EDGA"]
-            },
-            {
-                "name": "MIAX Exchange Group",
-                "symbols": ["Pearl", "Emerald", "Equities"]
-            },
-            {
-                "name": "Members Exchange",
-                "symbols": ["MEMX"]
-            },
-            {
-                "name": "Investors Exchange",
-                "symbols": ["IEX"]
-            },
-            {
-                "name": "Long-Term Stock Exchange",
-                "symbols": ["LTSE"]
-            }
-        ],
-        "additional_sources": [
-            {
-                "name": "FINRA Trading Facilities",
-                "description": "Provides trade reporting but not quotes",
-                "facilities": ["FINRA NYSE TRF", "FINRA Nasdaq TRF Carteret", "FINRA Nasdaq TRF Chicago"]
-            },
-            {
-                "name": "OTC Reporting Facility", 
-                "description": "Captures OTC trades but not quotes"
-            }
-        ],
-        "total_coverage": "19 major stock exchanges + dark pools + FINRA + OTC",
-        "data_quality": "Direct exchange feeds + SIP consolidation for accuracy"
-    }
-    return json.dumps(exchanges, indent=2)
+    return _EXCHANGE_INFO_JSON
 
 # Enhanced Market Data with Session Awareness
 @mcp.tool()
-def get_intraday_aggregates(
+@_tool
+async def get_intraday_aggregates(
     ticker: str,
     multiplier: int,
-    timespan: str,
+    timespan: Literal["minute", "hour", "day", "week", "month", "quarter", "year"],
     from_date: Union[str, int, datetime, date],
     to_date: Union[str, int, datetime, date],
     adjusted: Optional[bool] = None,
-    sort: Optional[str] = None,
+    sort: Optional[Literal["asc", "desc"]] = None,
     limit: Optional[int] = None,
     include_otc: bool = False,
 ) -> str:
@@ -681,41 +1057,55 @@ def get_intraday_aggregates(
     Returns:
         str: JSON string containing aggregate data with session information
     """
-    try:
-        # Convert dates to string format if needed
-        if isinstance(from_date, (datetime, date)):
-            from_date = from_date.strftime("%Y-%m-%d")
-        if isinstance(to_date, (datetime, date)):
-            to_date = to_date.strftime("%Y-%m-%d")
-        
-        path = f"/v2/aggs/ticker/{ticker.upper()}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
-        params = {}
-        if adjusted is not None:
-            params["adjusted"] = str(adjusted).lower()
-        if sort:
-            params["sort"] = sort
-        if limit:
-            params["limit"] = limit
-        if include_otc:
-            params["include_otc"] = "true"
-            
-        data = _polygon_get(path, params=params)
-        
-        # Add market session information to the response
-        if "results" in data and data["results"]:
-            for result in data["results"]:
-                if "t" in result:  # timestamp
-                    utc_time = datetime.fromtimestamp(result["t"] / 1000, tz=timezone.utc)
-                    et_time = utc_time + timedelta(hours=-5)  # Convert to ET
-                    result["market_session"] = _determine_market_session(et_time.hour, et_time.minute)
-                    result["et_time"] = et_time.strftime("%Y-%m-%d %H:%M:%S ET")
+    # Convert dates to string format if needed
+    if isinstance(from_date, (datetime, date)):
+        from_date = from_date.strftime("%Y-%m-%d")
+    if isinstance(to_date, (datetime, date)):
+        to_date = to_date.strftime("%Y-%m-%d")
+    
+    path = _PATH_AGGS.format(
+        ticker=_canon(ticker), multiplier=multiplier, timespan=timespan, from_date=from_date, to_date=to_date
+    )
+    params = _params(adjusted=adjusted, sort=sort, limit=limit, include_otc=include_otc)
         
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    data = await _polygon_get(path, params=params)
+    
+    # Add market session information to a copy, since the bars are shared with the cache
+    data = {**data, "results": [dict(bar) for bar in data.get("results") or []]}
+    _tag_market_sessions(data["results"])
+    
+    return _dumps(data)
 
 # Additional Stock-Related Tools
 
+_SIP_INFO_JSON = _dumps({
+    "what_are_sips": "Securities Information Processors (SIPs) consolidate trade and quote data from all exchanges into a single feed",
+    "sip_functions": [
+        "Provide National Best Bid and Offer (NBBO)",
+        "Consolidate last sale data",
+        "Ensure equal access to market data",
+        "Maintain transparent and fair trading environment"
+    ],
+    "major_sips": [
+        {
+            "name": "Consolidated Tape Association (CTA)",
+            "coverage": "NYSE-listed and regional exchange securities",
+            "tapes": ["Tape A", "Tape B"]
+        },
+        {
+            "name": "Unlisted Trading Privileges (UTP)",
+            "coverage": "All Nasdaq-listed securities", 
+            "tapes": ["Tape C"]
+        }
+    ],
+    "data_flow": [
+        "Exchanges → SIPs → Polygon.io → Users",
+        "Direct exchange feeds + SIP consolidation",
+        "Alternative Trading Systems (ATS) report to FINRA within 10 seconds"
+    ],
+    "importance": "SIPs are vital infrastructure ensuring all market participants have equal access to trade and quote data"
+}, pretty=True)
+
 @mcp.tool()
 def get_sip_info() -> str:
     """
@@ -724,34 +1114,40 @@ def get_sip_info() -> str:
     Returns:
         str: JSON string containing SIP information
     """
-    sip_info = {
-        "what_are_sips": "Securities Information Processors (SIPs) consolidate trade and quote data from all exchanges into a single feed",
-        "sip_functions": [
-            "Provide National Best Bid and Offer (NBBO)",
-            "Consolidate last sale data",
-            "Ensure equal access to market data",
-            "Maintain transparent and fair trading environment"
-        ],
-        "major_sips": [
-            {
-                "name": "Consolidated Tape Association (CTA)",
-                "coverage": "NYSE-listed and regional exchange securities",
-                "tapes": ["Tape A", "Tape B"]
-            },
-            {
-                "name": "Unlisted Trading Privileges (UTP)",
-                "coverage": "All Nasdaq-listed securities", 
-                "tapes": ["Tape C"]
-            }
-        ],
-        "data_flow": [
-            "Exchanges → SIPs → Polygon.io → Users",
-            "Direct exchange feeds + SIP consolidation",
-            "Alternative Trading Systems (ATS) report to FINRA within 10 seconds"
-        ],
-        "importance": "SIPs are vital infrastructure ensuring all market participants have equal access to trade and quote data"
+    return _SIP_INFO_JSON
+
+_MARKET_DATA_COVERAGE_JSON = _dumps({
+    "infrastructure": {
+        "primary_facility": "Equinix Data Center, New Jersey",
+        "redundancy": "ORD11 data center, Chicago",
+        "co_location": "Strategically co-located with exchanges",
+        "benefits": ["Reduced latency", "Enhanced reliability", "Direct physical connections"]
+    },
+    "data_sources": {
+        "exchanges": "All 19 major U.S. stock exchanges",
+        "dark_pools": "Additional dark pool data",
+        "finra": "FINRA trading facilities",
+        "otc": "OTC markets",
+        "ats": "Alternative Trading Systems"
+    },
+    "data_quality": {
+        "direct_feeds": "Direct relationships with each exchange",
+        "licensing": "Compliance with all licensing requirements",
+        "sip_integration": "Combines direct exchange access with regulated SIP consolidation",
+        "coverage": "Every trade, quote, and market event as it occurs"
+    },
+    "regulatory_compliance": {
+        "personal_use": "Full U.S. feed available for non-industry professionals",
+        "business_clients": "Tailored plans with specific exchange licensing",
+        "monitoring": "Close compliance monitoring for appropriate usage"
+    },
+    "market_hours": {
+        "pre_market": "4:00 AM - 9:30 AM ET",
+        "regular_market": "9:30 AM - 4:00 PM ET", 
+        "after_hours": "4:00 PM - 8:00 PM ET",
+        "timestamp_format": "Unix timestamps (UTC)"
     }
-    return json.dumps(sip_info, indent=2)
+}, pretty=True)
 
 @mcp.tool()
 def get_market_data_coverage() -> str:
@@ -761,42 +1157,11 @@ def get_market_data_coverage() -> str:
     Returns:
         str: JSON string containing coverage information
     """
-    coverage_info = {
-        "infrastructure": {
-            "primary_facility": "Equinix Data Center, New Jersey",
-            "redundancy": "ORD11 data center, Chicago",
-            "co_location": "Strategically co-located with exchanges",
-            "benefits": ["Reduced latency", "Enhanced reliability", "Direct physical connections"]
-        },
-        "data_sources": {
-            "exchanges": "All 19 major U.S. stock exchanges",
-            "dark_pools": "Additional dark pool data",
-            "finra": "FINRA trading facilities",
-            "otc": "OTC markets",
-            "ats": "Alternative Trading Systems"
-        },
-        "data_quality": {
-            "direct_feeds": "Direct relationships with each exchange",
-            "licensing": "Compliance with all licensing requirements",
-            "sip_integration": "Combines direct exchange access with regulated SIP consolidation",
-            "coverage": "Every trade, quote, and market event as it occurs"
-        },
-        "regulatory_compliance": {
-            "personal_use": "Full U.S. feed available for non-industry professionals",
-            "business_clients": "Tailored plans with specific exchange licensing",
-            "monitoring": "Close compliance monitoring for appropriate usage"
-        },
-        "market_hours": {
-            "pre_market": "4:00 AM - 9:30 AM ET",
-            "regular_market": "9:30 AM - 4:00 PM ET", 
-            "after_hours": "4:00 PM - 8:00 PM ET",
-            "timestamp_format": "Unix timestamps (UTC)"
-        }
-    }
-    return json.dumps(coverage_info, indent=2)
+    return _MARKET_DATA_COVERAGE_JSON
 
 @mcp.tool()
-def get_ticker_exchange_info(ticker: str) -> str:
+@_tool
+async def get_ticker_exchange_info(ticker: str) -> str:
     """
     Get detailed exchange and listing information for a specific ticker.
     
@@ -806,48 +1171,47 @@ def get_ticker_exchange_info(ticker: str) -> str:
     Returns:
         str: JSON string containing exchange information for the ticker
     """
-    try:
-        # First get basic ticker info
-        path = f"/v3/reference/tickers/{ticker.upper()}"
-        data = _polygon_get(path)
+    ticker = _canon(ticker)
+    # First get basic ticker info
+    path = _PATH_TICKER_DETAILS.format(ticker=ticker)
+    data = await _polygon_get(path)
+    
+    if "results" in data and data["results"]:
+        ticker_info = data["results"]
         
-        if "results" in data and data["results"]:
-            ticker_info = data["results"]
-            
-            # Add exchange coverage information
-            exchange_coverage = {
-                "ticker": ticker.upper(),
-                "primary_exchange": ticker_info.get("primary_exchange"),
-                "market": ticker_info.get("market"),
-                "locale": ticker_info.get("locale"),
-                "type": ticker_info.get("type"),
-                "active": ticker_info.get("active"),
-                "currency_name": ticker_info.get("currency_name"),
-                "cik": ticker_info.get("cik"),
-                "composite_figi": ticker_info.get("composite_figi"),
-                "share_class_figi": ticker_info.get("share_class_figi"),
-                "polygon_coverage": {
-                    "data_available": "Real-time trades, quotes, and market events",
-                    "exchange_feed": "Direct feed from primary exchange",
-                    "sip_integration": "Included in consolidated SIP feeds",
-                    "market_sessions": ["pre_market", "regular_market", "after_hours"]
-                }
+        # Add exchange coverage information
+        exchange_coverage = {
+            "ticker": ticker,
+            "primary_exchange": ticker_info.get("primary_exchange"),
+            "market": ticker_info.get("market"),
+            "locale": ticker_info.get("locale"),
+            "type": ticker_info.get("type"),
+            "active": ticker_info.get("active"),
+            "currency_name": ticker_info.get("currency_name"),
+            "cik": ticker_info.get("cik"),
+            "composite_figi": ticker_info.get("composite_figi"),
+            "share_class_figi": ticker_info.get("share_class_figi"),
+            "polygon_coverage": {
+                "data_available": "Real-time trades, quotes, and market events",
+                "exchange_feed": "Direct feed from primary exchange",
+                "sip_integration": "Included in consolidated SIP feeds",
+                "market_sessions": ["pre_market", "regular_market", "after_hours"]
             }
-            
-            return json.dumps(exchange_coverage, indent=2)
-        else:
-            return json.dumps({"error": f"No data found for ticker {ticker}"}, indent=2)
-            
-    except Exception as e:
-        return f"Error: {str(e)}"
+        }
+        
+        return _dumps(exchange_coverage)
+    else:
+        return _dumps({"error": f"No data found for ticker {ticker}"})
+        
 
 @mcp.tool()
-def get_earnings(
+@_tool
+async def get_earnings(
     ticker: Optional[str] = None,
     date: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
-    order: Optional[str] = None,
+    order: Optional[Literal["asc", "desc"]] = None,
 ) -> str:
     """
     Get earnings data for stocks.
@@ -862,32 +1226,20 @@ def get_earnings(
     Returns:
         str: JSON string containing earnings data
     """
-    try:
-        path = "/v3/reference/earnings"
-        params = {}
-        if ticker:
-            params["ticker"] = ticker.upper()
-        if date:
-            params["date"] = date
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-        if order:
-            params["order"] = order
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v3/reference/earnings"
+    params = _params(ticker=ticker, date=date, limit=limit, sort=sort, order=order)
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_analyst_ratings(
+@_tool
+async def get_analyst_ratings(
     ticker: Optional[str] = None,
     date: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
-    order: Optional[str] = None,
+    order: Optional[Literal["asc", "desc"]] = None,
+    stream: bool = False,
 ) -> str:
     """
     Get analyst ratings and price targets for stocks.
@@ -898,36 +1250,28 @@ def get_analyst_ratings(
         limit: Limit the number of results
         sort: Sort field (date, ticker, etc.)
         order: Sort order (asc, desc)
+        stream: Return the results as NDJSON, one record per line, instead of the full response;
+            a final {"next_url": ...} line is added when there are more pages
     
     Returns:
         str: JSON string containing analyst ratings data
     """
-    try:
-        path = "/v2/reference/analysts"
-        params = {}
-        if ticker:
-            params["ticker"] = ticker.upper()
-        if date:
-            params["date"] = date
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-        if order:
-            params["order"] = order
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v2/reference/analysts"
+    params = _params(ticker=ticker, date=date, limit=limit, sort=sort, order=order)
+        
+    if stream:
+        return await _polygon_get_ndjson(path, params=params)
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_short_interest(
+@_tool
+async def get_short_interest(
     ticker: Optional[str] = None,
     settlement_date: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
-    order: Optional[str] = None,
+    order: Optional[Literal["asc", "desc"]] = None,
+    stream: bool = False,
 ) -> str:
     """
     Get short interest data for stocks.
@@ -938,36 +1282,28 @@ def get_short_interest(
         limit: Limit the number of results
         sort: Sort field (settlement_date, ticker, etc.)
         order: Sort order (asc, desc)
+        stream: Return the results as NDJSON, one record per line, instead of the full response;
+            a final {"next_url": ...} line is added when there are more pages
     
     Returns:
         str: JSON string containing short interest data
     """
-    try:
-        path = "/v2/reference/short-interest"
-        params = {}
-        if ticker:
-            params["ticker"] = ticker.upper()
-        if settlement_date:
-            params["settlement_date"] = settlement_date
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-        if order:
-            params["order"] = order
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v2/reference/short-interest"
+    params = _params(ticker=ticker, settlement_date=settlement_date, limit=limit, sort=sort, order=order)
+        
+    if stream:
+        return await _polygon_get_ndjson(path, params=params)
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_options_contracts(
+@_tool
+async def get_options_contracts(
     underlying_asset: str,
-    contract_type: Optional[str] = None,
+    contract_type: Optional[Literal["call", "put"]] = None,
     strike_price: Optional[float] = None,
     expiration_date: Optional[str] = None,
     limit: Optional[int] = None,
+    stream: bool = False,
 ) -> str:
     """
     Get options contracts for a stock.
@@ -978,33 +1314,117 @@ def get_options_contracts(
         strike_price: Strike price of the option
         expiration_date: Expiration date (YYYY-MM-DD)
         limit: Limit the number of results
+        stream: Return the results as NDJSON, one record per line, instead of the full response;
+            a final {"next_url": ...} line is added when there are more pages
     
     Returns:
         str: JSON string containing options contracts data
     """
-    try:
-        path = f"/v3/reference/options/contracts"
-        params = {"underlying_asset": underlying_asset.upper()}
-        if contract_type:
-            params["contract_type"] = contract_type
-        if strike_price:
-            params["strike_price"] = strike_price
-        if expiration_date:
-            params["expiration_date"] = expiration_date
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v3/reference/options/contracts"
+    params = _params(
+        underlying_asset=underlying_asset,
+        contract_type=contract_type,
+        strike_price=strike_price,
+        expiration_date=expiration_date,
+        limit=limit,
+    )
+        
+    if stream:
+        return await _polygon_get_ndjson(path, params=params)
+    return await _polygon_get_raw(path, params=params)
 
-@mcp.tool()
-def get_options_snapshot(
+# Polygon's maximum page size for the options chain snapshot
+_OPTIONS_CHAIN_PAGE = 250
+# Pages of one expiration's chain fetched for local filtering, and contracts returned by
+# one strike-less call; past either cap the response carries next_url instead
+_MAX_CHAIN_PAGES = 4
+_MAX_CHAIN_RESULTS = 250
+# Chains outlive the 5s snapshot TTL so a sweep across strikes is served from one fetch
+_OPTIONS_CHAIN_TTL = 60
+_OPTIONS_CHAINS: TTLCache = TTLCache(maxsize=64, ttl=_OPTIONS_CHAIN_TTL)
+
+
+async def _options_chain(path: str, expiration_date: str) -> List[Dict[str, Any]]:
+    """Up to _MAX_CHAIN_PAGES pages of one expiration's chain snapshot, cached on _OPTIONS_CHAIN_TTL.
+
+    Pages are requested at Polygon's maximum size, for both contract types, and kept as
+    returned so each still carries the next_url that continues the chain after it.
+    """
+    key = (path, expiration_date)
+    with _CACHE_LOCK:
+        pages = _OPTIONS_CHAINS.get(key)
+    if pages is not None:
+        return pages
+    page = await _polygon_get(path, params={"expiration_date": expiration_date, "limit": _OPTIONS_CHAIN_PAGE})
+    pages = [page]
+    while len(pages) < _MAX_CHAIN_PAGES and (next_url := page.get("next_url")):
+        url = urlsplit(next_url)
+        page = await _polygon_get(url.path, params=dict(parse_qsl(url.query)))
+        pages.append(page)
+    with _CACHE_LOCK:
+        _OPTIONS_CHAINS[key] = pages
+    return pages
+
+
+def _contract_matches(
+    contract: Dict[str, Any], strike_price: Optional[float], contract_type: Optional[str]
+) -> bool:
+    details = contract.get("details") or {}
+    return (strike_price is None or details.get("strike_price") == strike_price) and (
+        contract_type is None or details.get("contract_type") == contract_type
+    )
+
+
+async def _options_snapshot(
     underlying_asset: str,
     strike_price: Optional[float] = None,
     expiration_date: Optional[str] = None,
     contract_type: Optional[str] = None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """Options chain snapshot; `extra` carries range bounds (strike_price.gte, ...), limit, order and sort"""
+    path = _PATH_OPTIONS_SNAPSHOT.format(underlying_asset=_canon(underlying_asset))
+    params = _params(strike_price=strike_price, expiration_date=expiration_date, contract_type=contract_type, **extra)
+    # Range bounds and paging options, or no expiration to scope the chain to, go to Polygon
+    # as one query whose next_url the caller can follow
+    if not expiration_date or params.keys() - {"strike_price", "expiration_date", "contract_type"}:
+        return await _polygon_get(path, params=params)
+    pages = await _options_chain(path, expiration_date)
+    if strike_price is not None and pages[-1].get("next_url"):
+        # The expiration runs past the pages fetched, so the strike may not be among them
+        return await _polygon_get(path, params=params)
+    # Filter the cached chain, so a sweep across strikes and types costs no further requests
+    envelope = {k: v for k, v in pages[0].items() if k not in ("results", "next_url")}
+    # Batch filters pass strikes through as given, possibly as strings
+    strike = None if strike_price is None else float(strike_price)
+    results: List[Dict[str, Any]] = []
+    next_url = None
+    for page in pages:
+        matched = [r for r in page.get("results") or () if _contract_matches(r, strike, contract_type)]
+        # Strike-less calls stop at a page boundary so next_url resumes right after them
+        if results and len(results) + len(matched) > _MAX_CHAIN_RESULTS:
+            break
+        results.extend(matched)
+        next_url = page.get("next_url")
+    envelope["results"] = results
+    if next_url:
+        envelope["next_url"] = next_url
+    return envelope
+
+
+async def _options_snapshot_for_filter(underlying_asset: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    unsupported = filters.keys() - _OPTIONS_SNAPSHOT_FILTERS
+    if unsupported:
+        raise ValueError(f"Unsupported filter keys: {', '.join(sorted(unsupported))}")
+    return await _options_snapshot(underlying_asset, **filters)
+
+@mcp.tool()
+@_tool
+async def get_options_snapshot(
+    underlying_asset: str,
+    strike_price: Optional[float] = None,
+    expiration_date: Optional[str] = None,
+    contract_type: Optional[Literal["call", "put"]] = None,
 ) -> str:
     """
     Get real-time options snapshot data.
@@ -1016,94 +1436,118 @@ def get_options_snapshot(
         contract_type: Type of option (call, put)
     
     Returns:
-        str: JSON string containing options snapshot data
+        str: JSON string containing options snapshot data. When expiration_date is given,
+            the contracts are filtered from that expiration's cached chain (a strike in an
+            expiration too long to cache is asked of Polygon directly); a strike-less call
+            returns up to 250 of them, with next_url continuing the chain when there are
+            more. Otherwise Polygon's response is returned as is.
     """
-    try:
-        path = f"/v3/snapshot/options/{underlying_asset.upper()}"
-        params = {}
-        if strike_price:
-            params["strike_price"] = strike_price
-        if expiration_date:
-            params["expiration_date"] = expiration_date
-        if contract_type:
-            params["contract_type"] = contract_type
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    data = await _options_snapshot(underlying_asset, strike_price, expiration_date, contract_type)
+    return _dumps(data)
+
+@mcp.tool()
+@_tool
+async def get_options_snapshots_batch(underlying_asset: str, filters: List[Dict[str, Any]]) -> str:
+    """
+    Get options snapshot data for several strike/expiration/type filters at once.
+    
+    Args:
+        underlying_asset: Stock ticker symbol
+        filters: List of filters, each with any of strike_price, expiration_date, contract_type,
+            limit, order, sort and the range bounds strike_price.gt/.gte/.lt/.lte and
+            expiration_date.gt/.gte/.lt/.lte, e.g. [{"strike_price": 150, "contract_type": "call"},
+            {"expiration_date": "2025-06-20", "strike_price.gte": 140, "strike_price.lte": 160}].
+            A filter with any other key gets an error entry instead of a snapshot
+    
+    Returns:
+        str: JSON string with one snapshot (or error) per filter, in the order given
+    """
+    # Concurrency and rate are bounded by the shared limits in _fetch_polygon
+    results = await asyncio.gather(
+        *(_options_snapshot_for_filter(underlying_asset, f) for f in filters), return_exceptions=True
+    )
+    return _dumps({
+        "results": [
+            {"filter": f, "error": str(result)} if isinstance(result, Exception) else {"filter": f, **result}
+            for f, result in zip(filters, results)
+        ]
+    })
+
+async def _get_financials(
+    ticker: str, timeframe: str = "quarterly", limit: Optional[int] = None, order: str = "desc"
+) -> Dict[str, Any]:
+    """Financials for a ticker, fetched once and cached so every statement view shares the response"""
+    params = _params(ticker=ticker, timeframe=timeframe, order=order, limit=limit)
+    return await _polygon_get("/vX/reference/financials", params=params)
+
+
+# Filing fields kept alongside each statement so periods can be told apart
+_FILING_KEYS = ("start_date", "end_date", "filing_date", "fiscal_period", "fiscal_year", "timeframe")
+
+
+def _financial_statement(data: Dict[str, Any], statement: str) -> Dict[str, Any]:
+    """Project a financials response down to one statement per filing"""
+    return {
+        **{k: v for k, v in data.items() if k != "results"},
+        "results": [
+            {
+                **{k: filing[k] for k in _FILING_KEYS if k in filing},
+                statement: (filing.get("financials") or {}).get(statement, {}),
+            }
+            for filing in data.get("results") or []
+        ],
+    }
 
 @mcp.tool()
-def get_balance_sheet(
+@_tool
+async def get_balance_sheet(
     ticker: str,
-    timeframe: str = "quarterly",
+    timeframe: Literal["quarterly", "annual", "ttm"] = "quarterly",
     limit: Optional[int] = None,
-    order: str = "desc",
+    order: Literal["asc", "desc"] = "desc",
 ) -> str:
     """
     Get balance sheet data for a stock.
     
     Args:
         ticker: Stock ticker symbol
-        timeframe: Timeframe (quarterly, annual)
+        timeframe: Timeframe (quarterly, annual, ttm)
         limit: Limit the number of results
         order: Sort order (asc, desc)
     
     Returns:
         str: JSON string containing balance sheet data
     """
-    try:
-        path = "/vX/reference/financials"
-        params = {
-            "ticker": ticker.upper(),
-            "timeframe": timeframe,
-            "order": order
-        }
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    data = await _get_financials(ticker, timeframe, limit, order)
+    return _dumps(_financial_statement(data, "balance_sheet"))
 
 @mcp.tool()
-def get_cash_flow(
+@_tool
+async def get_cash_flow(
     ticker: str,
-    timeframe: str = "quarterly",
+    timeframe: Literal["quarterly", "annual", "ttm"] = "quarterly",
     limit: Optional[int] = None,
-    order: str = "desc",
+    order: Literal["asc", "desc"] = "desc",
 ) -> str:
     """
     Get cash flow statement data for a stock.
     
     Args:
         ticker: Stock ticker symbol
-        timeframe: Timeframe (quarterly, annual)
+        timeframe: Timeframe (quarterly, annual, ttm)
         limit: Limit the number of results
         order: Sort order (asc, desc)
     
     Returns:
         str: JSON string containing cash flow data
     """
-    try:
-        path = "/vX/reference/financials"
-        params = {
-            "ticker": ticker.upper(),
-            "timeframe": timeframe,
-            "order": order
-        }
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    data = await _get_financials(ticker, timeframe, limit, order)
+    return _dumps(_financial_statement(data, "cash_flow_statement"))
 
 @mcp.tool()
-def get_market_gainers_losers(
-    direction: str,
+@_tool
+async def get_market_gainers_losers(
+    direction: Literal["gainers", "losers"],
     include_otc: bool = False,
     limit: Optional[int] = None,
 ) -> str:
@@ -1118,39 +1562,30 @@ def get_market_gainers_losers(
     Returns:
         str: JSON string containing gainers/losers data
     """
-    try:
-        path = f"/v2/snapshot/locale/us/markets/stocks/{direction}"
-        params = {}
-        if include_otc:
-            params["include_otc"] = "true"
-        if limit:
-            params["limit"] = limit
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = _PATH_GAINERS_LOSERS.format(direction=direction)
+    params = _params(include_otc=include_otc, limit=limit)
+        
+    return await _polygon_get_raw(path, params=params)
 
 @mcp.tool()
-def get_market_holidays() -> str:
+@_tool
+async def get_market_holidays() -> str:
     """
     Get upcoming market holidays and their open/close times.
     
     Returns:
         str: JSON string containing market holidays data
     """
-    try:
-        path = "/v1/marketstatus/upcoming"
-        data = _polygon_get(path)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
+    path = "/v1/marketstatus/upcoming"
+    return await _polygon_get_raw(path)
 
 @mcp.tool()
-def get_inflation_data(
+@_tool
+async def get_inflation_data(
     date: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    stream: bool = False,
 ) -> str:
     """
     Get inflation data from the Federal Reserve.
@@ -1159,21 +1594,42 @@ def get_inflation_data(
         date: Date for the inflation data
         limit: Limit the number of results
         sort: Sort field (date, value, etc.)
+        stream: Return the results as NDJSON, one record per line, instead of the full response;
+            a final {"next_url": ...} line is added when there are more pages
     
     Returns:
         str: JSON string containing inflation data
     """
-    try:
-        path = "/v1/indicators/inflation"
-        params = {}
-        if date:
-            params["date"] = date
-        if limit:
-            params["limit"] = limit
-        if sort:
-            params["sort"] = sort
-            
-        data = _polygon_get(path, params=params)
-        return json.dumps(data, indent=2)
-    except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+    path = "/v1/indicators/inflation"
+    params = _params(date=date, limit=limit, sort=sort)
+        
+    if stream:
+        return await _polygon_get_ndjson(path, params=params)
+    return await _polygon_get_raw(path, params=params)
+
+# Kick off server if file is run 
+if __name__ == "__main__":
+    # Log to stderr so nothing interleaves with the JSON-RPC stream on stdio
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.DEBUG if os.environ.get("DEBUG", "false").lower() == "true" else logging.INFO,
+    )
+    
+    # Check if HTTP transport is requested via environment variable
+    if os.environ.get("MCP_HTTP_TRANSPORT", "false").lower() == "true":
+        port = int(os.environ.get("PORT", 8000))
+        logger.info("Starting MCP server with SSE transport on port %d", port)
+        
+        # uvloop gives the HTTP event loop a faster I/O core; optional (not available on Windows)
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            logger.info("uvloop not installed, using the default asyncio event loop")
+        
+        # Use FastMCP's SSE transport for better compatibility with MCP clients
+        # This is what Langflow and other MCP clients expect
+        mcp.run(transport="sse", host="0.0.0.0", port=port)
+    else:
+        logger.info("Starting MCP server with stdio transport")
+        mcp.run(transport="stdio")